@@ -1,15 +1,56 @@
 #!/usr/bin/env python3
 import argparse
+import functools
+import io
+import math
 import os
+import queue
+import re
+import socket
 import sys
+import threading
+import time
 import requests
 import json
-from pathlib import Path
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json module
+    orjson = None
+
+# Both accept the raw UTF-8 bytes of an NDJSON line
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # ANSI colors
 YELLOW = "\033[93m"
 ANSWER_COLOR = "\033[96m"
 RESET = "\033[0m"
+_Y_THINK_OPEN = f"{YELLOW}<think>{RESET}"
+_Y_THINK_CLOSE = f"{YELLOW}</think>{RESET}"
+# Colors are only emitted when writing to a terminal
+_OUT_IS_TTY = sys.stdout.isatty()
+
+# The first tokens of a reply are flushed one by one for a fast first paint;
+# after that a token may sit in the stdout buffer this long (seconds).
+_STREAM_EAGER_TOKENS = 8
+_STREAM_FLUSH_INTERVAL = 0.032
+
+# Reasoning markers emitted by thinking models
+_THINK_RE = re.compile(r"(</?think>)")
+# Incomplete tag endings that may be finished by the next streamed token
+_TAG_PREFIXES = frozenset(
+    tag[:size] for tag in ("<think>", "</think>") for size in range(1, len(tag))
+)
+
+# One keep-alive session so interactive turns reuse the Ollama connection
+_SESSION = requests.Session()
+_SESSION.headers["Connection"] = "keep-alive"
+# Token frames are tiny and compress poorly; skip the zlib stage entirely.
+_SESSION.headers["Accept-Encoding"] = "identity"
 
 
 def load_system_prompt(path):
@@ -17,12 +58,12 @@ def load_system_prompt(path):
     if not path:
         return ""
 
-    file_path = Path(path)
-    if not file_path.exists():
-        return ""
-
     try:
-        return file_path.read_text(encoding="utf-8").strip("\n")
+        # Plain read() also covers pipes, FIFOs and /proc files, which report size 0.
+        with open(path, "rb") as handle:
+            return handle.read().decode("utf-8").strip("\n")
+    except FileNotFoundError:
+        return ""
     except OSError as exc:
         print(f"[Warning] Could not read system prompt file '{path}': {exc}", file=sys.stderr)
         return ""
@@ -37,32 +78,41 @@ def compose_prompt(system_prompt, user_prompt, data):
     return "\n\n".join(parts)
 
 
+def extend_prompt(prefix, data):
+    """Append data to a prompt already built by compose_prompt."""
+    if not data or not data.strip():
+        return prefix
+    data = data.strip("\n")
+    return f"{prefix}\n\n{data}" if prefix else data
+
+
 def strip_think_segments(text):
     """Return text with <think> sections removed."""
     if not text:
         return ""
 
+    # Fast paths: no reasoning block, or a single one (the usual shape).
+    first = text.find("<think>")
+    if first == -1:
+        return text.strip()
+    close = text.find("</think>", first + len("<think>"))
+    if close == -1:
+        return text[:first].strip()
+    after = close + len("</think>")
+    if text.find("<think>", after) == -1:
+        return (text[:first] + text[after:]).strip()
+
     result = []
-    idx = 0
     in_think = False
 
-    while idx < len(text):
+    for part in _THINK_RE.split(text):
         if in_think:
-            close_idx = text.find("</think>", idx)
-            if close_idx == -1:
-                break
-            idx = close_idx + len("</think>")
-            in_think = False
-        else:
-            open_idx = text.find("<think>", idx)
-            if open_idx == -1:
-                result.append(text[idx:])
-                break
-
-            if open_idx > idx:
-                result.append(text[idx:open_idx])
-            idx = open_idx + len("<think>")
+            if part == "</think>":
+                in_think = False
+        elif part == "<think>":
             in_think = True
+        elif part:
+            result.append(part)
 
     return "".join(result).strip()
 
@@ -72,142 +122,462 @@ def colorize_response(text):
     if not text:
         return ""
 
-    idx = 0
+    y, a, r = YELLOW, ANSWER_COLOR, RESET
     in_think = False
     output = []
 
-    while idx < len(text):
+    for part in _THINK_RE.split(text):
+        if not part:
+            continue
         if in_think:
-            close_idx = text.find("</think>", idx)
-            if close_idx == -1:
-                output.append(f"{YELLOW}{text[idx:]}{RESET}")
-                break
-
-            if close_idx > idx:
-                output.append(f"{YELLOW}{text[idx:close_idx]}{RESET}")
-            output.append(f"{YELLOW}</think>{RESET}")
-            idx = close_idx + len("</think>")
-            in_think = False
-        else:
-            open_idx = text.find("<think>", idx)
-            if open_idx == -1:
-                output.append(f"{ANSWER_COLOR}{text[idx:]}{RESET}")
-                break
-
-            if open_idx > idx:
-                output.append(f"{ANSWER_COLOR}{text[idx:open_idx]}{RESET}")
-            output.append(f"{YELLOW}<think>{RESET}")
-            idx = open_idx + len("<think>")
+            if part == "</think>":
+                output.append(_Y_THINK_CLOSE)
+                in_think = False
+            else:
+                output.append(y + part + r)
+        elif part == "<think>":
+            output.append(_Y_THINK_OPEN)
             in_think = True
+        else:
+            output.append(a + part + r)
 
     return "".join(output)
 
 
+def split_partial_tag(text):
+    """Split off a trailing incomplete <think>/</think> tag to carry into the next chunk."""
+    cut = text.rfind("<", max(0, len(text) - len("</think>") + 1))
+    if cut != -1 and text[cut:] in _TAG_PREFIXES:
+        return text[:cut], text[cut:]
+    return text, ""
+
+
 def print_stream_chunk(text, in_think):
-    """Stream a chunk of text with think/final color separation."""
-    idx = 0
+    """Write a chunk of text with think/final color separation (the caller flushes)."""
+    write = sys.stdout.write
+    y, a, r = YELLOW, ANSWER_COLOR, RESET
+    if "<" not in text:
+        # Most tokens carry no tag at all; skip the regex split for them.
+        if not text:
+            return in_think, ""
+        if in_think:
+            write(y + text + r)
+            return in_think, ""
+        write(a + text + r)
+        return in_think, text
+
+    out = []
     final_parts = []
-    while idx < len(text):
+    for part in _THINK_RE.split(text):
+        if not part:
+            continue
         if in_think:
-            close_idx = text.find("</think>", idx)
-            if close_idx == -1:
-                segment = text[idx:]
-                if segment:
-                    print(f"{YELLOW}{segment}{RESET}", end="", flush=True)
-                idx = len(text)
-            else:
-                segment = text[idx:close_idx]
-                if segment:
-                    print(f"{YELLOW}{segment}{RESET}", end="", flush=True)
-                print(f"{YELLOW}</think>{RESET}", end="", flush=True)
-                idx = close_idx + len("</think>")
+            if part == "</think>":
+                out.append(_Y_THINK_CLOSE)
                 in_think = False
-        else:
-            open_idx = text.find("<think>", idx)
-            if open_idx == -1:
-                segment = text[idx:]
-                if segment:
-                    print(f"{ANSWER_COLOR}{segment}{RESET}", end="", flush=True)
-                    final_parts.append(segment)
-                idx = len(text)
             else:
-                segment = text[idx:open_idx]
-                if segment:
-                    print(f"{ANSWER_COLOR}{segment}{RESET}", end="", flush=True)
-                    final_parts.append(segment)
-                print(f"{YELLOW}<think>{RESET}", end="", flush=True)
-                idx = open_idx + len("<think>")
-                in_think = True
+                out.append(y + part + r)
+        elif part == "<think>":
+            out.append(_Y_THINK_OPEN)
+            in_think = True
+        else:
+            out.append(a + part + r)
+            final_parts.append(part)
+    write("".join(out))
     return in_think, "".join(final_parts)
 
-def call_ollama_batch(api_url, model, prompt, temperature):
-    """Send a prompt to Ollama API and return response text (batch mode)."""
+
+def iter_ndjson(response, chunk_size=65536):
+    """Yield Ollama generation frames from a streamed NDJSON response as they arrive."""
+    buf = bytearray()
+    # The session asks for identity encoding; urllib3 only decodes if a proxy ignored that.
+    for chunk in response.raw.stream(chunk_size, decode_content=True):
+        buf += chunk
+        if b"\n" not in chunk:
+            continue
+        lines = buf.split(b"\n")
+        buf = lines.pop()  # incomplete trailing line, if any
+        for line in lines:
+            # Cheap byte test: only generation frames are worth parsing.
+            if b'"response"' not in line and b'"done"' not in line:
+                continue
+            try:
+                data = _json_loads(line)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                yield data
+    if b'"response"' in buf or b'"done"' in buf:
+        try:
+            data = _json_loads(buf)
+        except ValueError:
+            return
+        if isinstance(data, dict):
+            yield data
+
+
+def encode_json(payload):
+    """Serialize a request payload to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=8)
+def _request_head(model, temperature, num_ctx, keep_alive):
+    """Return the serialized fields that stay fixed for a session, open for the prompt."""
+    # Sampling parameters are only honoured under "options".
+    options = {"temperature": temperature}
+    if num_ctx:
+        options["num_ctx"] = num_ctx
+    payload = {
+        "model": model,
+        "options": options,
+        "stream": True,
+    }
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return encode_json(payload)[:-1] + b',"prompt":'
+
+
+class _FastHTTPError(requests.RequestException):
+    """The raw-socket backend could not handle the exchange."""
+
+
+class _SocketResponse:
+    """Streamed HTTP/1.1 response read straight off a socket for --fast-http.
+
+    Provides the parts of requests.Response the call functions use:
+    raise_for_status(), close(), and raw.stream()/raw.drain_conn().
+    """
+
+    def __init__(self, sock, block_size=65536):
+        self.raw = self
+        self._sock = sock
+        self._buf = bytearray()
+        self._block = bytearray(block_size)
+        self._view = memoryview(self._block)
+        self._chunked = False
+        self._length = None
+        self._read_head()
+
+    def _fill(self):
+        """Receive into the preallocated block and append it to the buffer."""
+        size = self._sock.recv_into(self._block)
+        if not size:
+            raise _FastHTTPError("Connection closed by server")
+        self._buf += self._view[:size]
+
+    def _read_line(self):
+        while True:
+            end = self._buf.find(b"\r\n")
+            if end != -1:
+                line = bytes(self._buf[:end])
+                del self._buf[:end + 2]
+                return line
+            self._fill()
+
+    def _read_head(self):
+        status = self._read_line().split(None, 2)
+        if len(status) < 2 or not status[0].startswith(b"HTTP/1.") or not status[1].isdigit():
+            raise _FastHTTPError(f"Malformed status line: {b' '.join(status)!r}")
+        self.status_code = int(status[1])
+        self.reason = status[2].decode("latin-1") if len(status) > 2 else ""
+        while True:
+            line = self._read_line()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            value = value.strip().lower()
+            if name == b"transfer-encoding":
+                self._chunked = value == b"chunked"
+                if not self._chunked:
+                    raise _FastHTTPError(f"Unsupported transfer encoding: {value!r}")
+            elif name == b"content-length" and value.isdigit():
+                self._length = int(value)
+            elif name == b"content-encoding" and value != b"identity":
+                raise _FastHTTPError(f"Unsupported content encoding: {value!r}")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} {self.reason}")
+
+    def stream(self, amt=None, decode_content=False):
+        """Yield body chunks as they arrive; amt and decode_content are ignored."""
+        try:
+            if self._chunked:
+                yield from self._stream_chunked()
+            else:
+                yield from self._stream_plain()
+        except OSError as exc:
+            raise _FastHTTPError(str(exc)) from exc
+
+    def _stream_chunked(self):
+        while True:
+            size_field = self._read_line().split(b";", 1)[0].strip()
+            try:
+                size = int(size_field, 16)
+            except ValueError:
+                raise _FastHTTPError(f"Malformed chunk size: {size_field!r}") from None
+            if size == 0:
+                while self._read_line():  # trailer headers
+                    pass
+                return
+            while len(self._buf) < size + 2:
+                self._fill()
+            chunk = bytes(self._buf[:size])
+            del self._buf[:size + 2]
+            yield chunk
+
+    def _stream_plain(self):
+        remaining = self._length
+        while remaining is None or remaining > 0:
+            if not self._buf:
+                try:
+                    self._fill()
+                except _FastHTTPError:
+                    if remaining is None:
+                        return  # body delimited by connection close
+                    raise
+            chunk = bytes(self._buf if remaining is None else self._buf[:remaining])
+            del self._buf[:len(chunk)]
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    def drain_conn(self):
+        # Requests are sent with "Connection: close"; there is nothing to reuse.
+        pass
+
+    def close(self):
+        self._sock.close()
+
+
+def _fast_post(api_url, path, body):
+    """Send one HTTP/1.1 POST over a plain socket and return its streamed response.
+
+    Returns None when the request was not sent (not a plain http:// URL, a
+    malformed one, or a refused connection), so the caller can use requests
+    instead; requests also reports bad URLs and connection errors properly.
+    """
+    try:
+        url = urlsplit(api_url)
+        if url.scheme != "http" or not url.hostname:
+            return None
+        address = (url.hostname, url.port or 80)
+        head = (
+            f"POST {url.path.rstrip('/')}{path} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept-Encoding: identity\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("latin-1")
+    except ValueError:  # bad port, or a host that is not plain ASCII/latin-1
+        return None
+    try:
+        sock = socket.create_connection(address, timeout=600)
+    except socket.timeout as exc:
+        # Retrying through requests would wait out the same timeout again.
+        raise _FastHTTPError(f"Timed out connecting to {url.netloc}") from exc
+    except OSError:
+        return None
+    # From here on the request may have reached Ollama; never resend it.
     try:
-        response = requests.post(
-            f"{api_url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "temperature": temperature,
-            },
-            stream=True,
-            timeout=600
-        )
+        sock.sendall(head + body)
+        return _SocketResponse(sock)
+    except OSError as exc:
+        sock.close()
+        raise _FastHTTPError(str(exc)) from exc
+    except BaseException:
+        sock.close()
+        raise
+
+
+def post_generate(api_url, model, prompt, temperature, context=None, num_ctx=None,
+                  keep_alive=None, fast_http=False):
+    """POST a generation request on the shared session and return the streamed response."""
+    # Only the prompt (and context) change per turn; splice them into the cached head.
+    parts = [_request_head(model, temperature, num_ctx, keep_alive), encode_json(prompt)]
+    if context:
+        # Continue from the tokens the server already evaluated last turn.
+        parts += (b',"context":', encode_json(context))
+    parts.append(b"}")
+    body = b"".join(parts)
+    if fast_http:
+        response = _fast_post(api_url, "/api/generate", body)
+        if response is not None:
+            return response
+        # Not sent: retry through requests, which also reports real connection errors.
+    return _SESSION.post(
+        f"{api_url}/api/generate",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        stream=True,
+        timeout=600
+    )
+
+
+def call_ollama_batch(api_url, model, prompt, temperature, context=None, num_ctx=None,
+                      keep_alive=None, fast_http=False):
+    """Send a prompt to Ollama API and return response text and context (batch mode)."""
+    response = None
+    try:
+        response = post_generate(api_url, model, prompt, temperature, context, num_ctx, keep_alive,
+                                 fast_http)
         response.raise_for_status()
 
-        output = []
-        for line in response.iter_lines():
-            if line:
-                try:
-                    data = json.loads(line.decode("utf-8"))
-                    output.append(data.get("response", ""))
-                except Exception:
-                    pass
-        raw_text = "".join(output)
-        return colorize_response(raw_text), strip_think_segments(raw_text)
+        output = io.StringIO()
+        next_context = None
+        for data in iter_ndjson(response):
+            text = data.get("response")
+            if isinstance(text, str):
+                output.write(text)
+            if data.get("done", False):
+                next_context = data.get("context")
+        raw_text = output.getvalue()
+        final_text = strip_think_segments(raw_text)
+        colored = colorize_response(raw_text) if _OUT_IS_TTY else raw_text
+        return colored, final_text, next_context
 
     except requests.RequestException as e:
         error_text = f"[Error contacting Ollama API: {e}]"
-        return error_text, ""
+        return error_text, "", None
+    finally:
+        if response is not None:
+            response.close()
 
 
-def call_ollama_stream(api_url, model, prompt, temperature):
+def call_ollama_stream(api_url, model, prompt, temperature, context=None, num_ctx=None,
+                       keep_alive=None, fast_http=False):
     """Send a prompt to Ollama API and stream response with color separation."""
+    response = None
     try:
-        response = requests.post(
-            f"{api_url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "temperature": temperature,
-            },
-            stream=True,
-            timeout=600
-        )
+        response = post_generate(api_url, model, prompt, temperature, context, num_ctx, keep_alive,
+                                 fast_http)
         response.raise_for_status()
 
+        flush = sys.stdout.flush
+        last_flush = time.monotonic()
+        emitted = 0
+        next_context = None
         in_think = False
+        carry = ""
         final_parts = []
-        for line in response.iter_lines():
-            if line:
-                try:
-                    data = json.loads(line.decode("utf-8"))
-                    text = data.get("response", "")
-                    if text:
-                        in_think, segment = print_stream_chunk(text, in_think)
-                        if segment:
-                            final_parts.append(segment)
-
-                    if data.get("done", False):
-                        break
-                except Exception:
-                    continue
-        print()  # newline after generation
-        return strip_think_segments("".join(final_parts))
+        for data in iter_ndjson(response):
+            text = data.get("response")
+            if not isinstance(text, str):
+                text = ""  # missing or malformed field
+            if text:
+                if not _OUT_IS_TTY:
+                    # Piped output gets no colors, so skip the tag state machine.
+                    sys.stdout.write(text)
+                    final_parts.append(text)
+                else:
+                    # Tags can be split across tokens ("<thi" + "nk>"); hold
+                    # back a partial tag until the next token completes it.
+                    was_in_think = in_think
+                    text, carry = split_partial_tag(carry + text)
+                    in_think, segment = print_stream_chunk(text, in_think)
+                    if segment:
+                        final_parts.append(segment)
+                    if in_think != was_in_think:
+                        last_flush = 0.0  # show think/answer switches at once
+
+                # Coalesce tokens into one terminal write per interval once
+                # the reply is under way, but never hold back a finished line.
+                emitted += 1
+                now = time.monotonic()
+                if (emitted <= _STREAM_EAGER_TOKENS or "\n" in text
+                        or now - last_flush >= _STREAM_FLUSH_INTERVAL):
+                    flush()
+                    last_flush = now
+
+            if data.get("done", False):
+                next_context = data.get("context")
+                # Discard the chunked trailer so the connection can be reused.
+                response.raw.drain_conn()
+                break
+        if carry:
+            in_think, segment = print_stream_chunk(carry, in_think)
+            if segment:
+                final_parts.append(segment)
+        print(flush=True)  # newline after generation
+        final_text = "".join(final_parts)
+        if not _OUT_IS_TTY:
+            # Colored output had its think segments dropped by print_stream_chunk.
+            final_text = strip_think_segments(final_text)
+        return final_text.strip(), next_context
 
     except requests.RequestException as e:
         print(f"[Error contacting Ollama API: {e}]")
-        return ""
+        return "", None
+    finally:
+        if response is not None:
+            response.close()
+
+
+def run_batch_lines(api_url, model, prefix, lines, temperature, concurrency, num_ctx=None,
+                    keep_alive=None, fast_http=False):
+    """Send each line as its own prompt concurrently and print replies in input order.
+
+    Lines are submitted as they arrive, with at most 2 * concurrency replies in
+    flight or waiting to be printed. Returns the number of prompts answered.
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    window = threading.Semaphore(2 * concurrency)
+    pending = queue.Queue()
+
+    def submit_lines():
+        try:
+            for line in lines:
+                window.acquire()
+                try:
+                    future = executor.submit(call_ollama_batch, api_url, model,
+                                             extend_prompt(prefix, line), temperature,
+                                             num_ctx=num_ctx, keep_alive=keep_alive,
+                                             fast_http=fast_http)
+                except RuntimeError:
+                    return  # the executor was shut down after Ctrl-C
+                pending.put((line, future))
+        finally:
+            pending.put(None)
+
+    # Read input on a helper thread so finished replies print while it waits for more.
+    threading.Thread(target=submit_lines, daemon=True).start()
+    answered = 0
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            line, future = item
+            response, _, _ = future.result()
+            window.release()
+            # Echo the input line so multi-line replies can be matched to it.
+            print(f"> {line}\n{response}", flush=True)
+            answered += 1
+    except KeyboardInterrupt:
+        # Drop the queued prompts instead of waiting for all of them to be sent.
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return answered
+
+
+def read_stdin():
+    """Read all of stdin as raw bytes and decode it once."""
+    return sys.stdin.buffer.read().decode("utf-8", errors="replace")
+
+
+def iter_stdin_lines():
+    """Yield the non-empty lines of stdin one at a time, as they arrive."""
+    for raw in sys.stdin.buffer:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if line.strip():
+            yield line
 
 
 def read_user_input(prompt_text, input_stream):
@@ -223,18 +593,21 @@ def read_user_input(prompt_text, input_stream):
 
 
 def interactive_mode(api_url, model, mode, temperature, system_prompt, user_prompt,
-                     memory_lines, memory_seed=None, input_stream=None):
+                     memory_lines, memory_seed=None, input_stream=None,
+                     reuse_context=False, context_seed=None, num_ctx=None, keep_alive=None,
+                     fast_http=False):
     """Interactive chat mode with selectable output mode."""
     print(f"Interactive mode with model '{model}' at {api_url}")
     print(f"Mode: {mode}, Temperature: {temperature}")
     print("Type 'exit' or Ctrl+C to quit.")
-    memory = list(memory_seed) if memory_seed else []
-    if memory_lines > 0 and memory:
-        memory[:] = memory[-memory_lines:]
+    memory = deque(memory_seed or (), maxlen=memory_lines if memory_lines > 0 else None)
+    history_text = "\n".join(memory)
+    context = context_seed if reuse_context else None
+    stdin_is_tty = sys.stdin.isatty()
     local_stream = input_stream
     close_stream = False
     if local_stream is None:
-        if sys.stdin.isatty():
+        if stdin_is_tty:
             local_stream = None
         else:
             tty_paths = ["CONIN$"] if os.name == "nt" else ["/dev/tty"]
@@ -245,17 +618,17 @@ def interactive_mode(api_url, model, mode, temperature, system_prompt, user_prom
                     break
                 except OSError:
                     local_stream = None
-            if local_stream is None and sys.stdin.isatty():
-                local_stream = None
-            elif local_stream is None:
+            if local_stream is None:
                 local_stream = sys.stdin
 
+    # System and user prompts are fixed for the session; compose them once.
+    static_prefix = compose_prompt(system_prompt, user_prompt, "")
     try:
         while True:
             try:
                 prompt = read_user_input("You: ", local_stream)
             except EOFError:
-                if local_stream is sys.stdin and not sys.stdin.isatty():
+                if local_stream is sys.stdin and not stdin_is_tty:
                     print("\n[Warning] No interactive input available; exiting.")
                 else:
                     print("\nExiting.")
@@ -265,36 +638,55 @@ def interactive_mode(api_url, model, mode, temperature, system_prompt, user_prom
                 break
 
             user_text = prompt.strip()
-            if user_text.lower() in {"exit", "quit"}:
+            # Only short input can be a command; skip lowercasing real messages.
+            if len(user_text) == 4 and user_text.lower() in {"exit", "quit"}:
                 break
-            history_block = ""
-            if memory:
-                history_block = "History of Past Interaction:\n" + "\n".join(memory)
-
             current_block = ""
             if user_text:
                 current_block = f"Current User Message:\n{user_text}"
 
-            conversation_parts = [part for part in (history_block, current_block) if part]
-            conversation_input = "\n\n".join(conversation_parts)
-            final_prompt = compose_prompt(system_prompt, user_prompt, conversation_input)
+            if context:
+                # The server-side context already holds the prompts and history.
+                final_prompt = current_block
+            else:
+                history_block = ""
+                if memory:
+                    history_block = "History of Past Interaction:\n" + history_text
+
+                conversation_parts = [part for part in (history_block, current_block) if part]
+                conversation_input = "\n\n".join(conversation_parts)
+                final_prompt = extend_prompt(static_prefix, conversation_input)
             if not final_prompt:
                 continue
             final_text = ""
             if mode == "stream":
                 print("LLM (thinking): ", end="", flush=True)
-                final_text = call_ollama_stream(api_url, model, final_prompt, temperature)
+                try:
+                    final_text, next_context = call_ollama_stream(
+                        api_url, model, final_prompt, temperature, context, num_ctx, keep_alive, fast_http)
+                except KeyboardInterrupt:
+                    # The stream closed its response on the way out, which stops the generation.
+                    print(f"{RESET if _OUT_IS_TTY else ''}\n[Interrupted]", flush=True)
+                    final_text, next_context = "", None
             else:  # batch
-                response, final_text = call_ollama_batch(api_url, model, final_prompt, temperature)
+                response, final_text, next_context = call_ollama_batch(
+                    api_url, model, final_prompt, temperature, context, num_ctx, keep_alive, fast_http)
                 print(response)
+            if reuse_context:
+                context = next_context
 
             if memory_lines > 0:
+                turn_lines = []
                 if user_text:
-                    memory.append(f"User: {user_text}")
+                    turn_lines.append(f"User: {user_text}")
                 if final_text:
-                    memory.append(f"Assistant: {final_text.strip()}")
-                if len(memory) > memory_lines:
-                    memory[:] = memory[-memory_lines:]
+                    turn_lines.append(f"Assistant: {final_text.strip()}")
+                for line in turn_lines:
+                    if len(memory) == memory.maxlen:
+                        # Cut the line the deque is about to evict, plus its separator.
+                        history_text = history_text[len(memory[0]) + 1:]
+                    memory.append(line)
+                    history_text = f"{history_text}\n{line}" if history_text else line
     finally:
         if close_stream and local_stream not in {None, sys.stdin}:
             try:
@@ -303,6 +695,21 @@ def interactive_mode(api_url, model, mode, temperature, system_prompt, user_prom
                 pass
 
 
+def parse_keep_alive(value):
+    """Return a keep_alive value for Ollama: plain numbers as seconds, anything else as a duration string."""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        seconds = float(value)
+    except ValueError:
+        return value  # a duration string such as "30m"
+    if not math.isfinite(seconds):
+        raise argparse.ArgumentTypeError(f"invalid keep-alive value: {value!r}")
+    return seconds
+
+
 def main():
     parser = argparse.ArgumentParser(description="bsy-clippy: Ollama API Client")
     parser.add_argument("-i", "--ip", default="172.20.0.100",
@@ -315,6 +722,12 @@ def main():
                         help="Output mode: 'stream' = real-time, 'batch' = wait for final output")
     parser.add_argument("-t", "--temperature", type=float, default=0.7,
                         help="Sampling temperature (default: 0.7, higher = more random)")
+    parser.add_argument("-n", "--num-ctx", type=int, default=None,
+                        help="Context window size in tokens (default: the model's own setting)")
+    parser.add_argument("-a", "--keep-alive", type=parse_keep_alive, default="30m",
+                        help="How long Ollama keeps the model loaded after a request, "
+                             "e.g. '30m', '0' to unload immediately, '-1' to keep loaded forever "
+                             "(default: 30m)")
     parser.add_argument("-s", "--system-file", default="bsy-clippy.txt",
                         help="Path to a system prompt file (default: bsy-clippy.txt)")
     parser.add_argument("-u", "--user-prompt", default="",
@@ -323,45 +736,80 @@ def main():
                         help="Remember this many lines of conversation in interactive mode")
     parser.add_argument("-c", "--chat-after-stdin", action="store_true",
                         help="After processing stdin, continue in interactive chat mode")
+    parser.add_argument("-k", "--keep-context", action="store_true",
+                        help="In interactive mode, continue from Ollama's returned context "
+                             "instead of resending the prompts and history each turn")
+    parser.add_argument("-F", "--fast-http", action="store_true",
+                        help="Talk to plain-http Ollama over a raw socket instead of requests "
+                             "(falls back to requests if it cannot connect)")
+    parser.add_argument("-b", "--batch-lines", action="store_true",
+                        help="Send each non-empty stdin line as a separate prompt (batch output)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                        help="Parallel requests for --batch-lines (default: 4)")
 
     args = parser.parse_args()
     api_url = f"http://{args.ip}:{args.port}"
     system_prompt = load_system_prompt(args.system_file)
     user_prompt = args.user_prompt
     memory_lines = max(0, args.memory_lines)
+    num_ctx = args.num_ctx if args.num_ctx and args.num_ctx > 0 else None
     chat_after_stdin = args.chat_after_stdin
+    concurrency = max(1, args.concurrency)
+
+    # Size the connection pool once so every --batch-lines worker keeps its own connection.
+    pool_size = max(4, concurrency) if args.batch_lines else 4
+    for prefix in ("http://", "https://"):
+        _SESSION.mount(prefix, HTTPAdapter(pool_connections=2, pool_maxsize=pool_size))
 
     # Detect mode if not specified
+    stdin_is_tty = sys.stdin.isatty()
     mode = args.mode
     if mode is None:
-        if not sys.stdin.isatty():
+        if not stdin_is_tty:
             mode = "batch"   # stdin defaults to batch
         else:
             mode = "stream"  # interactive defaults to stream
 
-    if not sys.stdin.isatty():
-        data = sys.stdin.read()
-        full_prompt = compose_prompt(system_prompt, user_prompt, data)
-
-        if not full_prompt:
-            interactive_mode(api_url, args.model, mode, args.temperature, system_prompt, user_prompt, memory_lines)
+    static_prefix = compose_prompt(system_prompt, user_prompt, "")
+    if not stdin_is_tty:
+        if args.batch_lines:
+            # Stream the lines in, so long or endless input (tail -f) is answered as it comes.
+            answered = run_batch_lines(api_url, args.model, static_prefix, iter_stdin_lines(),
+                                       args.temperature, concurrency, num_ctx, args.keep_alive,
+                                       args.fast_http)
+            # An empty pipe goes straight to chat, as in the single-prompt path below.
+            if chat_after_stdin or not answered:
+                interactive_mode(api_url, args.model, mode, args.temperature, system_prompt, user_prompt, memory_lines,
+                                 reuse_context=args.keep_context, num_ctx=num_ctx, keep_alive=args.keep_alive,
+                                 fast_http=args.fast_http)
             return
 
-        memory_seed = []
+        data = read_stdin()
         data_text = data.strip()
-        if data_text:
-            memory_seed.append(f"User: {data_text}")
+        if not data_text:
+            # Empty pipe: go straight to chat instead of sending a bare system prompt.
+            interactive_mode(api_url, args.model, mode, args.temperature, system_prompt, user_prompt, memory_lines,
+                             reuse_context=args.keep_context, num_ctx=num_ctx, keep_alive=args.keep_alive,
+                             fast_http=args.fast_http)
+            return
+
+        full_prompt = extend_prompt(static_prefix, data)
+        memory_seed = [f"User: {data_text}"]
 
         final_text = ""
         if mode == "stream":
-            final_text = call_ollama_stream(api_url, args.model, full_prompt, args.temperature)
+            final_text, context = call_ollama_stream(api_url, args.model, full_prompt, args.temperature,
+                                                     num_ctx=num_ctx, keep_alive=args.keep_alive,
+                                                     fast_http=args.fast_http)
         else:
-            response, final_text = call_ollama_batch(api_url, args.model, full_prompt, args.temperature)
+            response, final_text, context = call_ollama_batch(api_url, args.model, full_prompt, args.temperature,
+                                                              num_ctx=num_ctx, keep_alive=args.keep_alive,
+                                                              fast_http=args.fast_http)
             print(response)
         if chat_after_stdin:
             if final_text:
                 memory_seed.append(f"Assistant: {final_text.strip()}")
-            if memory_lines > 0 and memory_seed:
+            if memory_lines > 0:
                 memory_seed = memory_seed[-memory_lines:]
             interactive_mode(
                 api_url,
@@ -371,11 +819,18 @@ def main():
                 system_prompt,
                 user_prompt,
                 memory_lines,
-                memory_seed if memory_seed else None,
+                memory_seed,
+                reuse_context=args.keep_context,
+                context_seed=context,
+                num_ctx=num_ctx,
+                keep_alive=args.keep_alive,
+                fast_http=args.fast_http,
             )
         return
 
-    interactive_mode(api_url, args.model, mode, args.temperature, system_prompt, user_prompt, memory_lines)
+    interactive_mode(api_url, args.model, mode, args.temperature, system_prompt, user_prompt, memory_lines,
+                     reuse_context=args.keep_context, num_ctx=num_ctx, keep_alive=args.keep_alive,
+                     fast_http=args.fast_http)
 
 
 if __name__ == "__main__":